@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
-import json 
-from flask import Flask, jsonify, request, Response 
+from flask import Flask, jsonify, request 
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, firestore
@@ -9,10 +8,13 @@ import chromadb
 from sentence_transformers import SentenceTransformer
 import numpy as np 
 import traceback # Hata ayıklama için
+from catalog import load_catalog
+from responses import json_response
 
 # --- Veritabanı Adları ---
 FIRESTORE_COLLECTION = "content"
 CHROMA_COLLECTION = "content_vectors"
+CATALOG_SNAPSHOT_PATH = os.getenv('CATALOG_SNAPSHOT_PATH', 'catalog_snapshot.npz')
 
 # --- Ayar (Tuning) Parametreleri ---
 CANDIDATE_POOL_SIZE = 1500  # Aday Havuzu
@@ -72,24 +74,43 @@ try:
 except Exception as e:
     print(f"HATA: Sentence Transformer modeli yüklenemedi. Hata: {e}")
 
+print("İçerik kataloğu hazırlanıyor...")
+catalog = load_catalog(CATALOG_SNAPSHOT_PATH)
+
 
 # --- 2. YARDIMCI FONKSİYONLAR ---
 # (get_content_from_firestore, extract_ids_from_entries... Değişiklik yok)
 def get_content_from_firestore(ids_list):
+    """ İçerikleri katalogdan döndürür ({id: row}); katalogda olmayanları FireStore'dan çekip ekler. """
     if not ids_list:
         return {}
-    content_data = {}
-    unique_ids = list(set(ids_list))
-    for i in range(0, len(unique_ids), 30):
-        chunk_ids = unique_ids[i:i+30]
+    content_rows = {}
+    missing_ids = []
+    for id in set(ids_list):
+        if id in catalog:
+            content_rows[id] = catalog.row_of[id]
+        else:
+            missing_ids.append(id)
+    for i in range(0, len(missing_ids), 30):
+        chunk_ids = missing_ids[i:i+30]
         try:
             docs = content_collection.where(u"__name__", 'in', chunk_ids).stream()
             for doc in docs:
-                content_data[doc.id] = doc.to_dict()
+                content_rows[doc.id] = catalog.add(doc.id, doc.to_dict())
         except Exception as e:
             print(f"FireStore'dan '{chunk_ids}' çekilirken hata: {e}") 
             continue
-    return content_data
+    return content_rows
+
+def build_taste_signals(content_rows, strong_signal_ids):
+    """ Güçlü sinyallerden (favori + izlenen) yaratıcı/oyuncu ID setleri ve tür maskesi çıkarır. """
+    strong_rows = [row for id, row in content_rows.items() if id in strong_signal_ids]
+    fav_creators = set(catalog.creator_ids[row] for row in strong_rows if catalog.creator_ids[row] >= 0)
+    fav_actors = set(actor for row in strong_rows for actor in catalog.top_actor_ids(row))
+    fav_genre_mask = 0
+    for row in strong_rows:
+        fav_genre_mask |= catalog.genre_masks[row]
+    return fav_creators, fav_actors, fav_genre_mask
 
 # 'normalize_score' fonksiyonu artık iki modlu
 def normalize_content_score(value, max_points=30, min_val=0, max_val=2.0):
@@ -131,9 +152,7 @@ def get_virality_score(rating, max_points=50):
 @app.route('/')
 def index():
     data = {"message": f"API Sunucusu çalışıyor! (Tuning 8.0 - Kademeli/Keşif Motorlu)"}
-    json_response = json.dumps(data, ensure_ascii=False, indent=4)
-    return Response(json_response,
-                    content_type="application/json; charset=utf-8")
+    return json_response(data)
 
 # --- 4. ANA ÖNERİ UÇ NOKTASI (BUNA DOKUNULMADI, GÜVENDE) ---
 @app.route('/api/v1/recommendations', methods=['GET'])
@@ -165,8 +184,8 @@ def get_recommendations():
 
         # 2. TÜM LİSTELERİN VEKTÖRLERİNİ VE AĞIRLIKLARINI HAZIRLA
         all_ids_to_fetch = list(all_user_ids)
-        content_meta_data = get_content_from_firestore(all_ids_to_fetch)
-        valid_ids = [id for id in all_ids_to_fetch if id in content_meta_data]
+        content_meta_rows = get_content_from_firestore(all_ids_to_fetch)
+        valid_ids = [id for id in all_ids_to_fetch if id in content_meta_rows]
         if not valid_ids:
             print(f"Uyarı: Kullanıcının listelerindeki ID'ler ({all_ids_to_fetch}) bizim veritabanımızda bulunamadı.")
             return jsonify({"message": "Listenizdeki içerikler, öneri veritabanımızdaki içeriklerle eşleşmedi."}), 200
@@ -201,55 +220,47 @@ def get_recommendations():
         )
         candidate_ids = query_results['ids'][0]
         distances = query_results['distances'][0]
-        cand_content_data = get_content_from_firestore(candidate_ids)
+        cand_content_rows = get_content_from_firestore(candidate_ids)
 
         # 5. KURAL TABANLI (%70) PUANLAMA
         print(f"Kural tabanlı puanlama {len(candidate_ids)} aday için başlıyor...")
         
         strong_signal_ids = set(fav_ids + watched_ids)
-        strong_signal_data = {id: data for id, data in content_meta_data.items() if id in strong_signal_ids}
-        fav_creators = set(data.get('director_or_creator', '') for data in strong_signal_data.values() if data.get('director_or_creator'))
-        fav_genres = set(genre for data in strong_signal_data.values() for genre in data.get('genres', []))
-        fav_actors = set(actor for data in strong_signal_data.values() for actor in data.get('actors', [])[:3])
+        fav_creators, fav_actors, fav_genre_mask = build_taste_signals(content_meta_rows, strong_signal_ids)
         final_scored_recommendations = []
         
         for i, cand_id in enumerate(candidate_ids):
             if cand_id in all_user_ids: continue 
-            if cand_id not in cand_content_data: continue
-            cand_content = cand_content_data[cand_id]
+            if cand_id not in cand_content_rows: continue
+            row = cand_content_rows[cand_id]
             
             # Ana Motor: 30/70 Puanlama
             content_score = normalize_content_score(distances[i], max_points=30) # Max 30
             rule_score = 0
             
             # Kademeli Puanlama (Max 70)
-            if cand_content.get('director_or_creator') and cand_content.get('director_or_creator') in fav_creators:
+            if catalog.creator_ids[row] in fav_creators:
                 rule_score += 30
-            cand_actors = set(cand_content.get('actors', [])[:3])
-            actor_matches = len(cand_actors.intersection(fav_actors))
+            actor_matches = sum(1 for actor in catalog.top_actor_ids(row) if actor in fav_actors)
             if actor_matches == 1:
                 rule_score += 15
             elif actor_matches >= 2:
                 rule_score += 20
-            cand_genres = set(cand_content.get('genres', []))
-            genre_matches = len(cand_genres.intersection(fav_genres))
+            genre_matches = bin(catalog.genre_masks[row] & fav_genre_mask).count("1")
             if genre_matches == 1:
                 rule_score += 5
             elif genre_matches == 2:
                 rule_score += 10
             elif genre_matches >= 3:
                 rule_score += 15
-            if cand_content.get('rating', 0) >= 8.0:
+            if catalog.ratings[row] >= 8.0:
                 rule_score += 5
             
             final_score = content_score + rule_score
             
             final_scored_recommendations.append({
                 "content_id": cand_id,
-                "type": cand_content.get('type'),
-                "title": cand_content.get('title'),
-                "poster_url": cand_content.get('poster_url'),
-                "year": cand_content.get('year'),
+                **catalog.display_fields(row),
                 "final_score": round(final_score, 2),
                 "debug_details": {
                     "content_score (max 30)": round(content_score, 2),
@@ -270,9 +281,7 @@ def get_recommendations():
         top_recommendations = high_quality_recommendations[:10]
         print(f"Toplam {len(sorted_recommendations)} adaydan, {len(high_quality_recommendations)} tanesi {MIN_SCORE_THRESHOLD} puan eşiğini geçti. İlk {len(top_recommendations)} tanesi döndürülüyor.")
         
-        json_response = json.dumps(top_recommendations, ensure_ascii=False, indent=4)
-        return Response(json_response,
-                        content_type="application/json; charset=utf-8")
+        return json_response(top_recommendations)
 
     except Exception as e:
         print(f"HATA: Öneri hesaplanırken bir sorun oluştu: {e}")
@@ -319,8 +328,8 @@ def get_chatbot_recommendations():
         
         # --- ZEVK VEKTÖRÜNÜ YİNE DE HESAPLA (Aday çekmek için LAZIM) ---
         all_ids_to_fetch = list(all_user_ids)
-        content_meta_data = get_content_from_firestore(all_ids_to_fetch)
-        valid_ids = [id for id in all_ids_to_fetch if id in content_meta_data]
+        content_meta_rows = get_content_from_firestore(all_ids_to_fetch)
+        valid_ids = [id for id in all_ids_to_fetch if id in content_meta_rows]
         if not valid_ids:
              return jsonify({"message": "Listenizdeki içerikler, öneri veritabanımızdaki içeriklerle eşleşmedi."}), 200
         vector_data = chroma_collection.get(ids=valid_ids, include=['embeddings'])
@@ -356,44 +365,39 @@ def get_chatbot_recommendations():
         )
         candidate_ids = query_results['ids'][0]
         distances = query_results['distances'][0]
-        cand_content_data = get_content_from_firestore(candidate_ids)
+        cand_content_rows = get_content_from_firestore(candidate_ids)
         
         print(f"Puanlama {len(candidate_ids)} aday için başlıyor...")
         
         # 2. ADAYLARI PUANLA (FİLTRELİ VEYA FİLTRESİZ)
+        genre_filter_mask = catalog.genre_mask_for(genre_filters)
         
         # Ana motor için kullanılacak KURAL setleri
         strong_signal_ids = set(fav_ids + watched_ids)
-        strong_signal_data = {id: data for id, data in content_meta_data.items() if id in strong_signal_ids}
-        fav_creators = set(data.get('director_or_creator', '') for data in strong_signal_data.values() if data.get('director_or_creator'))
-        fav_genres = set(genre for data in strong_signal_data.values() for genre in data.get('genres', []))
-        fav_actors = set(actor for data in strong_signal_data.values() for actor in data.get('actors', [])[:3])
+        fav_creators, fav_actors, fav_genre_mask = build_taste_signals(content_meta_rows, strong_signal_ids)
         
         for i, cand_id in enumerate(candidate_ids):
             if cand_id in all_user_ids: continue 
-            if cand_id not in cand_content_data: continue
+            if cand_id not in cand_content_rows: continue
                 
-            cand_content = cand_content_data[cand_id]
+            row = cand_content_rows[cand_id]
             
             # --- YENİ: CHATBOT "KEŞİF MODU" PUANLAMASI ---
             if genre_filters:
                 # Adım 2a: Tür Filtreleme ("OR" mantığı)
-                cand_genres_set = set(cand_content.get('genres', []))
-                if not cand_genres_set.intersection(genre_filters):
+                if not catalog.genre_masks[row] & genre_filter_mask:
                     continue # İstenen türlerden HİÇBİRİ yoksa atla
                 
                 # Adım 2b: "Keşif Puanı" Hesapla
                 # (Kişisel zevk + Genel Kalite)
                 content_score = normalize_content_score(distances[i], max_points=50) # Max 50
-                virality_score = get_virality_score(cand_content.get('rating', 0), max_points=50) # Max 50
+                virality_score = get_virality_score(catalog.ratings[row], max_points=50) # Max 50
                 
                 final_score = content_score + virality_score
                 
                 final_scored_recommendations.append({
-                    "content_id": cand_id, "type": cand_content.get('type'),
-                    "title": cand_content.get('title'),
-                    "poster_url": cand_content.get('poster_url'),
-                    "year": cand_content.get('year'),
+                    "content_id": cand_id,
+                    **catalog.display_fields(row),
                     "final_score": round(final_score, 2),
                     "debug_details": {
                         "content_score (max 50)": round(content_score, 2),
@@ -408,33 +412,28 @@ def get_chatbot_recommendations():
                 rule_score = 0
                 
                 # Kademeli Puanlama (Max 70)
-                if cand_content.get('director_or_creator') and cand_content.get('director_or_creator') in fav_creators:
+                if catalog.creator_ids[row] in fav_creators:
                     rule_score += 30
-                cand_actors = set(cand_content.get('actors', [])[:3])
-                actor_matches = len(cand_actors.intersection(fav_actors))
+                actor_matches = sum(1 for actor in catalog.top_actor_ids(row) if actor in fav_actors)
                 if actor_matches == 1:
                     rule_score += 15
                 elif actor_matches >= 2:
                     rule_score += 20
-                cand_genres = set(cand_content.get('genres', []))
-                genre_matches = len(cand_genres.intersection(fav_genres))
+                genre_matches = bin(catalog.genre_masks[row] & fav_genre_mask).count("1")
                 if genre_matches == 1:
                     rule_score += 5
                 elif genre_matches == 2:
                     rule_score += 10
                 elif genre_matches >= 3:
                     rule_score += 15
-                if cand_content.get('rating', 0) >= 8.0:
+                if catalog.ratings[row] >= 8.0:
                     rule_score += 5
                 
                 final_score = content_score + rule_score
                 
                 final_scored_recommendations.append({
                     "content_id": cand_id,
-                    "type": cand_content.get('type'),
-                    "title": cand_content.get('title'),
-                    "poster_url": cand_content.get('poster_url'),
-                    "year": cand_content.get('year'),
+                    **catalog.display_fields(row),
                     "final_score": round(final_score, 2),
                     "debug_details": {
                         "content_score (max 30)": round(content_score, 2),
@@ -464,9 +463,7 @@ def get_chatbot_recommendations():
 
         print(f"Toplam {len(sorted_recommendations)} adaydan (ve {len(genre_filters)} filtreden) sonra, {len(high_quality_recommendations)} tanesi {active_threshold} puan eşiğini geçti. İlk {len(top_recommendations)} tanesi döndürülüyor.")
         
-        json_response = json.dumps(top_recommendations, ensure_ascii=False, indent=4)
-        return Response(json_response,
-                        content_type="application/json; charset=utf-8")
+        return json_response(top_recommendations)
 
     except Exception as e:
         print(f"HATA: Öneri hesaplanırken bir sorun oluştu: {e}")
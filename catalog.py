@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+from array import array
+import numpy as np
+
+# --- Kompakt (Sütunlu) İçerik Kataloğu ---
+# Firestore'dan gelen her içerik için ayrı bir dict tutmak yerine, tüm alanlar
+# sütunlar halinde saklanır: rating float32, year int16, türler bit maskesi,
+# yönetmen/yaratıcı ve oyuncular ise tamsayı ID'leri olarak (interned).
+
+CATALOG_SNAPSHOT_VERSION = 1
+TOP_ACTOR_COUNT = 3   # Puanlamada kullanılan ilk N oyuncu
+MAX_GENRES = 64       # Tür maskesi 64 bit (TMDB'de ~27 tür var)
+NO_ID = -1            # Boş yönetmen / oyuncu slotu
+
+
+class Vocab:
+    """ String -> tamsayı ID eşleştirmesi (interning). """
+    __slots__ = ('_ids', 'names')
+
+    def __init__(self, names=None):
+        self.names = list(names) if names else []
+        self._ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self._ids[name] = idx
+            self.names.append(name)
+        return idx
+
+    def lookup(self, name):
+        return self._ids.get(name, NO_ID)
+
+
+def _parse_year(value):
+    try:
+        return int(str(value)[:4])
+    except (TypeError, ValueError):
+        return 0
+
+
+class ContentCatalog:
+    """
+    Tüm içeriklerin sütunlu, bellek dostu temsili.
+    Her içerik bir satır indeksine (row) sahiptir; puanlama bu indeksler ve
+    tamsayı ID'leri üzerinden yapılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.row_of = {}                 # content_id -> row
+        self.content_ids = []
+        self.titles = []
+        self.poster_urls = []
+        self.types = array('b')          # type_vocab ID'si
+        self.ratings = array('f')        # float32
+        self.years = array('h')          # int16 (0 = bilinmiyor)
+        self.genre_masks = array('Q')    # uint64 bit maskesi
+        self.creator_ids = array('i')    # creator_vocab ID'si veya NO_ID
+        self.actor_ids = array('i')      # satır başına TOP_ACTOR_COUNT slot
+        self.type_vocab = Vocab()
+        self.genre_vocab = Vocab()
+        self.creator_vocab = Vocab()
+        self.actor_vocab = Vocab()
+
+    def __len__(self):
+        return len(self.content_ids)
+
+    def __contains__(self, content_id):
+        return content_id in self.row_of
+
+    # --- Ekleme ---
+    def add(self, content_id, data):
+        """ Firestore'dan gelen bir dict'i kataloğa ekler ve satır indeksini döndürür. """
+        with self._lock:
+            row = self.row_of.get(content_id)
+            if row is not None:
+                return row
+
+            genre_mask = 0
+            for genre in data.get('genres', []):
+                bit = self.genre_vocab.intern(genre)
+                if bit < MAX_GENRES:
+                    genre_mask |= 1 << bit
+                else:
+                    print(f"UYARI: Tür maskesi dolu, '{genre}' türü yok sayıldı.")
+
+            creator = data.get('director_or_creator')
+            creator_id = self.creator_vocab.intern(creator) if creator else NO_ID
+
+            # Eski kodla aynı: set(actors[:3])
+            top_actors = []
+            for actor in data.get('actors', [])[:TOP_ACTOR_COUNT]:
+                actor_id = self.actor_vocab.intern(actor)
+                if actor_id not in top_actors:
+                    top_actors.append(actor_id)
+            top_actors += [NO_ID] * (TOP_ACTOR_COUNT - len(top_actors))
+
+            row = len(self.content_ids)
+            self.content_ids.append(content_id)
+            self.titles.append(data.get('title'))
+            self.poster_urls.append(data.get('poster_url'))
+            self.types.append(self.type_vocab.intern(data.get('type') or ''))
+            self.ratings.append(float(data.get('rating') or 0))
+            self.years.append(_parse_year(data.get('year')))
+            self.genre_masks.append(genre_mask)
+            self.creator_ids.append(creator_id)
+            self.actor_ids.extend(top_actors)
+            self.row_of[content_id] = row
+            return row
+
+    # --- Okuma (Puanlama için) ---
+    def top_actor_ids(self, row):
+        start = row * TOP_ACTOR_COUNT
+        return [a for a in self.actor_ids[start:start + TOP_ACTOR_COUNT] if a != NO_ID]
+
+    def genre_mask_for(self, genre_names):
+        """ Tür isimlerini bit maskesine çevirir (bilinmeyen türler yok sayılır). """
+        mask = 0
+        for name in genre_names:
+            bit = self.genre_vocab.lookup(name)
+            if 0 <= bit < MAX_GENRES:
+                mask |= 1 << bit
+        return mask
+
+    def display_fields(self, row):
+        """ API yanıtında dönen alanlar (eski dict formatıyla aynı). """
+        year = self.years[row]
+        return {
+            "type": self.type_vocab.names[self.types[row]] or None,
+            "title": self.titles[row],
+            "poster_url": self.poster_urls[row],
+            "year": str(year) if year else "",
+        }
+
+    # --- Snapshot (Kaydetme / Yükleme) ---
+    def save(self, path):
+        """ Kataloğu sıkıştırılmış .npz dosyasına yazar (pickle kullanılmaz). """
+        with self._lock:
+            np.savez_compressed(
+                path,
+                version=np.array([CATALOG_SNAPSHOT_VERSION], dtype=np.int16),
+                content_ids=np.array(self.content_ids, dtype=str),
+                titles=np.array([t or '' for t in self.titles], dtype=str),
+                poster_urls=np.array([p or '' for p in self.poster_urls], dtype=str),
+                types=np.frombuffer(self.types, dtype=np.int8),
+                ratings=np.frombuffer(self.ratings, dtype=np.float32),
+                years=np.frombuffer(self.years, dtype=np.int16),
+                genre_masks=np.frombuffer(self.genre_masks, dtype=np.uint64),
+                creator_ids=np.frombuffer(self.creator_ids, dtype=np.int32),
+                actor_ids=np.frombuffer(self.actor_ids, dtype=np.int32),
+                type_vocab=np.array(self.type_vocab.names, dtype=str),
+                genre_vocab=np.array(self.genre_vocab.names, dtype=str),
+                creator_vocab=np.array(self.creator_vocab.names, dtype=str),
+                actor_vocab=np.array(self.actor_vocab.names, dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path):
+        catalog = cls()
+        with np.load(path, allow_pickle=False) as snap:
+            version = int(snap['version'][0])
+            if version != CATALOG_SNAPSHOT_VERSION:
+                raise ValueError(f"Desteklenmeyen katalog snapshot sürümü: {version}")
+            catalog.content_ids = snap['content_ids'].tolist()
+            catalog.titles = snap['titles'].tolist()
+            catalog.poster_urls = snap['poster_urls'].tolist()
+            catalog.types.frombytes(snap['types'].astype(np.int8).tobytes())
+            catalog.ratings.frombytes(snap['ratings'].astype(np.float32).tobytes())
+            catalog.years.frombytes(snap['years'].astype(np.int16).tobytes())
+            catalog.genre_masks.frombytes(snap['genre_masks'].astype(np.uint64).tobytes())
+            catalog.creator_ids.frombytes(snap['creator_ids'].astype(np.int32).tobytes())
+            catalog.actor_ids.frombytes(snap['actor_ids'].astype(np.int32).tobytes())
+            catalog.type_vocab = Vocab(snap['type_vocab'].tolist())
+            catalog.genre_vocab = Vocab(snap['genre_vocab'].tolist())
+            catalog.creator_vocab = Vocab(snap['creator_vocab'].tolist())
+            catalog.actor_vocab = Vocab(snap['actor_vocab'].tolist())
+        catalog.row_of = {content_id: row for row, content_id in enumerate(catalog.content_ids)}
+        return catalog
+
+
+def load_catalog(path):
+    """ Snapshot varsa yükler, yoksa (veya bozuksa) boş katalog döndürür. """
+    if path and os.path.exists(path):
+        try:
+            catalog = ContentCatalog.load(path)
+            print(f"Katalog snapshot'ı yüklendi: {len(catalog)} içerik ({path}).")
+            return catalog
+        except Exception as e:
+            print(f"HATA: Katalog snapshot'ı ('{path}') yüklenemedi. Hata: {e}")
+    return ContentCatalog()
@@ -8,6 +8,7 @@ from sentence_transformers import SentenceTransformer
 import chromadb
 import firebase_admin
 from firebase_admin import credentials, firestore
+from catalog import ContentCatalog
 
 # Posterler için TMDB'nin ana URL'si
 TMDB_POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500" 
@@ -16,6 +17,7 @@ TMDB_POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500"
 FIRESTORE_COLLECTION = "content"
 CHROMA_COLLECTION = "content_vectors"
 BACKUP_FILENAME = "tmdb_content_10k.json"
+CATALOG_SNAPSHOT_PATH = os.getenv('CATALOG_SNAPSHOT_PATH', 'catalog_snapshot.npz')
 
 def main():
     # === 1. ADIM: KURULUM VE ANAHTAR YÜKLEME ===
@@ -143,6 +145,13 @@ def main():
     with open(BACKUP_FILENAME, 'w', encoding='utf-8') as f:
         json.dump(all_content_data, f, ensure_ascii=False, indent=4)
 
+    # API sunucusunun açılışta yükleyeceği kompakt katalog snapshot'ı
+    print(f"Kompakt katalog snapshot'ı '{CATALOG_SNAPSHOT_PATH}' dosyasına yazılıyor...")
+    catalog = ContentCatalog()
+    for content in all_content_data:
+        catalog.add(content['id'], content)
+    catalog.save(CATALOG_SNAPSHOT_PATH)
+
     # === 4. ADIM: MODELLERİ VE VERİTABANLARINI YÜKLEME ===
     
     print("Firebase'e bağlanılıyor...")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import gzip
+import hashlib
+import json
+from flask import request, Response
+
+# --- Opsiyonel Hızlı Kütüphaneler ---
+try:
+    import orjson # Hızlı JSON encoder (varsa)
+except ImportError:
+    orjson = None
+
+try:
+    import brotli # Brotli sıkıştırma (varsa)
+except ImportError:
+    brotli = None
+
+# --- Ayar Parametreleri ---
+MIN_COMPRESS_SIZE = 512 # Bu boyutun altındaki yanıtlar sıkıştırılmaz (byte)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def dumps_compact(data):
+    """ Veriyi boşluksuz (compact) UTF-8 JSON byte'larına çevirir. """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def make_etag(body):
+    """ Yanıt gövdesinin (sonuç setinin) parmak izi. """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def choose_encoding():
+    """ İstemcinin Accept-Encoding başlığına göre en iyi sıkıştırmayı seçer (br > gzip). """
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def json_response(data, status=200):
+    """
+    JSON yanıtı oluşturur: compact serileştirme, ETag / If-None-Match (304)
+    ve gzip/brotli sıkıştırma.
+    """
+    body = dumps_compact(data)
+    etag = make_etag(body)
+
+    if status == 200 and request.if_none_match.contains_weak(etag):
+        response = Response(status=304) # İçerik değişmedi, gövde gönderilmez
+    else:
+        encoding = choose_encoding() if len(body) >= MIN_COMPRESS_SIZE else None
+        response = Response(compress(body, encoding), status=status, content_type=JSON_CONTENT_TYPE)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    # Sıkıştırma farklı olsa da içerik aynı -> zayıf (weak) ETag
+    response.set_etag(etag, weak=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'private, no-cache' # Kişisel içerik, her seferinde doğrula
+    return response